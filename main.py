@@ -3,10 +3,14 @@ A2E Avatar → TTS → Video pipeline
 
 Requirements:
   pip install requests python-dotenv
+  (optional) pip install orjson   # faster JSON parsing/printing
 
 Environment:
   A2E_API_TOKEN = your token string
   (optional) A2E_BASE = https://video.a2e.ai
+  (optional) A2E_NO_CACHE = 1 to bypass the voice/anchor list cache in ~/.cache/a2e
+  (optional) A2E_LOG = INFO (default) | WARN — WARN hides the raw API response dumps
+  (optional) A2E_ETAGS = 1 to send If-None-Match when polling avatar status (if the API sets ETags)
 
 Usage examples:
   python a2e_avatar_pipeline.py \
@@ -34,17 +38,36 @@ Notes:
 from __future__ import annotations
 
 import argparse
+import concurrent.futures
+import hashlib
+import itertools
 import json
+import logging
 import os
+import random
 import re
+import shutil
+import socket
 import sys
+import tempfile
 import time
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, Iterable, Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
 
 import requests
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.util.retry import Retry
+
+try:  # optional: native JSON codec, falls back to the stdlib
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+logger = logging.getLogger("a2e")
 
 
 # ----------------------------
@@ -58,39 +81,184 @@ def _env(key: str, default: Optional[str] = None) -> str:
     return v
 
 
-def _print_json(title: str, obj: Any) -> None:
-    print(f"\n== {title} ==")
+def _log_json(title: str, obj: Any) -> None:
+    """Log a raw API response at INFO; serialization is skipped entirely when INFO is disabled."""
+    if not logger.isEnabledFor(logging.INFO):
+        return
     try:
-        print(json.dumps(obj, indent=2, ensure_ascii=False))
+        if orjson is not None:
+            text = orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode()
+        else:
+            text = json.dumps(obj, indent=2, ensure_ascii=False)
     except Exception:
-        print(obj)
+        text = str(obj)
+    logger.info("\n== %s ==\n%s", title, text)
+
+
+def _loads(r: requests.Response) -> Any:
+    """Decode a JSON response body, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(r.content)
+    return r.json()
+
+
+# ----------------------------
+# Response cache (voice_list / character_list)
+# ----------------------------
+
+_CACHE_DIR = Path(os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache") / "a2e"
+_CACHE_TTL_S = 24 * 3600
+
+
+def _cache_enabled() -> bool:
+    return os.getenv("A2E_NO_CACHE") != "1"
+
+
+def _cache_path(*key: Any) -> Path:
+    h = hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest()
+    return _CACHE_DIR / f"{h}.json"
+
+
+def _cache_read(path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        if time.time() - path.stat().st_mtime > _CACHE_TTL_S:
+            return None
+        return json.loads(path.read_bytes())
+    except (OSError, ValueError):
+        return None
+
+
+def _cache_write(path: Path, data: Dict[str, Any]) -> None:
+    """Write atomically (temp file + rename) so concurrent runs never read a partial entry."""
+    tmp: Optional[Path] = None
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=path.parent, suffix=".tmp", delete=False) as f:
+            tmp = Path(f.name)
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp, path)
+    except (OSError, TypeError, ValueError):
+        # The cache is best-effort, but don't leave an orphaned temp file behind
+        if tmp is not None:
+            try:
+                tmp.unlink(missing_ok=True)
+            except OSError:
+                pass
+
+
+# Poll back-off schedule (seconds), capped at the caller's poll_s. Short jobs are noticed within a
+# few seconds instead of idling up to a full fixed interval; long jobs settle at poll_s, so the
+# total number of requests only grows by a handful.
+_POLL_INTERVALS = (2, 3, 5, 8, 13, 21)
+
+
+def _poll_sleeps(poll_s: float) -> Iterator[float]:
+    """Yield jittered sleep durations: the back-off schedule capped at poll_s, then poll_s forever."""
+    for interval in itertools.chain(_POLL_INTERVALS, itertools.repeat(poll_s)):
+        interval = min(interval, poll_s)
+        # Up to +25% jitter so concurrent pipelines don't poll in lockstep.
+        yield interval + random.uniform(0, 0.25 * interval)
+
+
+_URL_RE = re.compile(r"https?://[^\s\"']+")
 
 
 def _first_url_from(obj: Any, exts: Iterable[str] = (".mp4", ".m3u8", ".mov", ".webm", ".mp3", ".aac", ".wav", ".jpg", ".jpeg", ".png")) -> Optional[str]:
     """Walk an arbitrary JSON-like structure and find the first URL, preferring certain extensions."""
     urls: list[str] = []
 
-    def collect(o: Any) -> None:
-        if isinstance(o, dict):
-            for v in o.values():
-                collect(v)
-        elif isinstance(o, (list, tuple)):
-            for v in o:
-                collect(v)
+    # Iterative depth-first walk (no recursion limit, no frame per node). Children are pushed
+    # reversed so URLs are still collected in document order.
+    stack = [obj]
+    while stack:
+        o = stack.pop()
+        t = type(o)
+        if t is str:
+            urls.extend(_URL_RE.findall(o))
+        elif t is dict:
+            stack.extend(reversed(o.values()))
+        elif t is list or t is tuple:
+            stack.extend(reversed(o))
         elif isinstance(o, str):
-            for m in re.findall(r"https?://[^\s\"']+", o):
-                urls.append(m)
-
-    collect(obj)
+            urls.extend(_URL_RE.findall(o))
+        elif isinstance(o, dict):
+            stack.extend(reversed(list(o.values())))
+        elif isinstance(o, (list, tuple)):
+            stack.extend(reversed(o))
 
-    # Prefer by extension order
+    # Prefer by extension order: bucket each URL once by the extension before its query string,
+    # then take the first URL of the most preferred non-empty bucket. Extensions are normalized
+    # to ".ext" form ("mp4" -> ".mp4"); multi-dot ones (".tar.gz") can't be found by the single
+    # dict lookup, so those fall back to an endswith() check.
+    by_ext: Dict[str, list[str]] = {}
     for ext in exts:
-        for u in urls:
-            if u.lower().split("?", 1)[0].endswith(ext):
-                return u
+        ext = ext.lower()
+        by_ext.setdefault(ext if ext.startswith(".") else "." + ext, [])
+    multi_dot = [ext for ext in by_ext if ext.count(".") > 1]
+    for u in urls:
+        path = u.lower().partition("?")[0]
+        dot = path.rfind(".")
+        bucket = by_ext.get(path[dot:]) if dot >= 0 else None
+        if bucket is not None:
+            bucket.append(u)
+        for ext in multi_dot:
+            if path.endswith(ext):
+                by_ext[ext].append(u)
+    for bucket in by_ext.values():
+        if bucket:
+            return bucket[0]
     return urls[0] if urls else None
 
 
+# Terminal job states, compared against normalized (stripped, lower-cased) API statuses
+_AVATAR_OK = frozenset({"ready", "trained", "succeeded", "completed"})
+_AVATAR_BAD = frozenset({"failed", "error"})
+_VIDEO_OK = frozenset({"ready", "success", "completed"})
+_VIDEO_BAD = frozenset({"failed", "error"})
+
+
+def _norm_status(status: Any) -> str:
+    return str(status or "").strip().lower()
+
+
+def _avatar_status(item: Dict[str, Any]) -> str:
+    """Normalized status of a userVideoTwin record."""
+    return _norm_status((item.get("data") or {}).get("current_status"))
+
+
+def _video_status(item: Dict[str, Any]) -> str:
+    """Normalized status of an awsResult response (A2E returns the task as data[0]); "" if absent."""
+    data = item.get("data") or [{}]
+    task = data[0] if isinstance(data, list) and isinstance(data[0], dict) else {}
+    return _norm_status(task.get("status"))
+
+
+# Gateway/rate-limit statuses worth retrying; anything else is reported to the caller
+_TRANSIENT_STATUSES = (429, 500, 502, 503, 504)
+
+
+class _TunedAdapter(HTTPAdapter):
+    """HTTPAdapter whose pooled sockets set TCP_NODELAY (urllib3's default) plus TCP keepalive.
+
+    The small JSON POSTs are written and immediately read back, so Nagle must stay off. Keepalive
+    probes start after 60 s idle (the kernel default is usually 2 h, longer than any avatar wait),
+    so idle pooled connections aren't silently dropped by NATs while the pipeline is waiting.
+    The timing knobs are platform-specific and only set where the socket module exposes them.
+    """
+
+    SOCKET_OPTIONS = HTTPConnection.default_socket_options + [
+        (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+    ] + [
+        (socket.IPPROTO_TCP, getattr(socket, name), value)
+        for name, value in (("TCP_KEEPIDLE", 60), ("TCP_KEEPINTVL", 20), ("TCP_KEEPCNT", 3))
+        if hasattr(socket, name)
+    ]
+
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        kwargs.setdefault("socket_options", self.SOCKET_OPTIONS)
+        super().init_poolmanager(*args, **kwargs)
+
+
 # ----------------------------
 # Client
 # ----------------------------
@@ -99,14 +267,30 @@ class A2EClient:
     token: str
     base: str = "https://video.a2e.ai"
     timeout: int = 60
+    max_workers: int = 4
+    etags: bool = False  # conditional (If-None-Match) avatar polls; not every A2E endpoint sets ETags
 
     def __post_init__(self) -> None:
         self.session = requests.Session()
-        self.session.headers.update({
-            "Authorization": f"Bearer {self.token}",
-            "Accept": "application/json",
-            "User-Agent": "a2e-client/1.0",
-        })
+        # One worker pool for all background calls (downloads, TTS, concurrent polls); threads are
+        # started on demand and reused, instead of spinning up an executor per step.
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="a2e")
+        # Keep TCP+TLS warm across endpoints and absorb transient failures. Only GETs are retried
+        # on read errors and 429/5xx: the POSTs create billable jobs (text2image, startTraining,
+        # continueTranining, send_tts, video/generate), and resending one the server already accepted
+        # would duplicate it. Connect errors are retried for every method (nothing was sent yet).
+        # The awsResult poll (a POST) is retried by the poll loops instead, see _poll_video_result.
+        # raise_on_status=False hands the last response back so raise_for_status() still reports it.
+        retry = Retry(
+            total=5,
+            backoff_factor=0.3,
+            status_forcelist=_TRANSIENT_STATUSES,
+            allowed_methods=frozenset(["GET"]),
+            raise_on_status=False,
+        )
+        adapter = _TunedAdapter(pool_connections=8, pool_maxsize=32, max_retries=retry)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
         self.session.headers.update({
             "Authorization": f"Bearer {self.token}",
             "Accept": "application/json",
@@ -114,11 +298,72 @@ class A2EClient:
             "x-lang": "en-US",                 # <-- add this (backend sometimes requires it)
             "Content-Type": "application/json" # <-- not strictly required with json=, but harmless
         })
+        self._memo: Dict[Any, Dict[str, Any]] = {}
+        self._avatar_etags: Dict[str, Tuple[str, Dict[str, Any]]] = {}  # avatar_id -> (ETag, record)
+
+        # Endpoint URLs, built once instead of on every call (the pollers hit the same URL repeatedly)
+        api = f"{self.base}/api/v1"
+        self._url_text2img = f"{api}/userText2image/start"
+        self._url_start_training = f"{api}/userVideoTwin/startTraining"
+        self._url_avatar = f"{api}/userVideoTwin/"
+        self._url_continue_training = f"{api}/userVideoTwin/continueTranining"
+        self._url_voice_list = f"{api}/anchor/voice_list"
+        self._url_send_tts = f"{api}/video/send_tts"
+        self._url_character_list = f"{api}/anchor/character_list"
+        self._url_video_generate = f"{api}/video/generate"
+        self._url_video_result = f"{api}/video/awsResult"
+
+    def _cached_get(self, url: str, params: Dict[str, str]) -> Dict[str, Any]:
+        """GET a read-only listing through an in-memory + on-disk cache (A2E_NO_CACHE=1 disables it)."""
+        if not _cache_enabled():
+            r = self.session.get(url, params=params, timeout=self.timeout)
+            r.raise_for_status()
+            return _loads(r)
+
+        key = (url, tuple(sorted(params.items())))
+        if key in self._memo:
+            return self._memo[key]
+        # The token is part of the disk key: custom anchors (and possibly voices) are per account.
+        path = _cache_path(self.token, *key)
+        data = _cache_read(path)
+        if data is None:
+            r = self.session.get(url, params=params, timeout=self.timeout)
+            r.raise_for_status()
+            data = _loads(r)
+            # Only cache successful, non-empty listings; e.g. anchors may not exist yet right after training.
+            if not (isinstance(data, dict) and data.get("code") in (0, None) and data.get("data")):
+                return data
+            _cache_write(path, data)
+        self._memo[key] = data
+        return data
+
+    def submit(self, fn: Callable[..., Any], /, *args: Any, **kwargs: Any) -> concurrent.futures.Future:
+        """Run fn(*args, **kwargs) on the client's worker pool."""
+        return self._executor.submit(fn, *args, **kwargs)
+
+    def close(self, *, wait: bool = True) -> None:
+        """Release the worker pool and HTTP connections. By default outstanding background work is
+        waited for; with wait=False queued work is cancelled and running calls are not waited on."""
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+        self.session.close()
+
+    def __enter__(self) -> "A2EClient":
+        return self
+
+    def __exit__(self, exc_type: Any, *exc: Any) -> None:
+        # On an error or Ctrl-C, don't block on an in-flight download/TTS call
+        self.close(wait=exc_type is None)
+
+    def _post_json(self, url: str, body: Dict[str, Any]) -> requests.Response:
+        """POST a JSON body; pre-serialized with orjson when available (Content-Type is a session header)."""
+        if orjson is not None:
+            return self.session.post(url, data=orjson.dumps(body), timeout=self.timeout)
+        return self.session.post(url, json=body, timeout=self.timeout)
 
     # ---- Text → Image ----
     def text2image(self, name: str, prompt: str, width: int = 1024, height: int = 768,
                    req_key: str = "high_aes_general_v21_L") -> Dict[str, Any]:
-        url = f"{self.base}/api/v1/userText2image/start"
+        url = self._url_text2img
         body = {
             "name": name,
             "prompt": prompt,
@@ -126,9 +371,9 @@ class A2EClient:
             "width": width,
             "height": height,
         }
-        r = self.session.post(url, json=body, timeout=self.timeout)
+        r = self._post_json(url, body)
         r.raise_for_status()
-        return r.json()
+        return _loads(r)
 
     # ---- Avatar (Video Twin) ----
     def start_avatar_training_from_image(
@@ -147,7 +392,7 @@ class A2EClient:
 # --- at top of start_avatar_training_from_image ---
         if " " in image_url:
             raise ValueError("image_url must not contain spaces; URL-encode them as %20.")        
-        url = f"{self.base}/api/v1/userVideoTwin/startTraining"
+        url = self._url_start_training
         body: Dict[str, Any] = {
             "name": name,
             "gender": gender,
@@ -171,70 +416,89 @@ class A2EClient:
         # return r.json()
 
         # --- replace the tail of start_avatar_training_from_image ---
-        r = self.session.post(url, json=body, timeout=self.timeout)
+        r = self._post_json(url, body)
 
         try:
             r.raise_for_status()
         except requests.HTTPError as e:
             raise requests.HTTPError(f"{e}\nResponse text: {r.text}") from None
 
-        data = r.json()
+        data = _loads(r)
         # Surface API-level errors (A2E wraps results as {"code": ..., "data": ..., "msg": ...})
         if isinstance(data, dict) and data.get("code") not in (0, None):
             raise RuntimeError(f"A2E API error (code={data.get('code')}): {data.get('msg') or data.get('message')}")
         return data
 
-    def get_avatar(self, avatar_id: str) -> Dict[str, Any]:
-        url = f"{self.base}/api/v1/userVideoTwin/{avatar_id}"
-        r = self.session.get(url, timeout=self.timeout)
+    def get_avatar(self, avatar_id: str, *, wait_s: Optional[int] = None) -> Dict[str, Any]:
+        """Fetch the avatar record; with wait_s, ask the server to hold the request (long-poll) until it changes."""
+        url = self._url_avatar + avatar_id
+        cached = self._avatar_etags.get(avatar_id) if self.etags else None
+        headers = {"If-None-Match": cached[0]} if cached else None
+        if wait_s:
+            # The read timeout must outlast the server-side hold.
+            r = self.session.get(url, params={"wait": wait_s}, headers=headers, timeout=max(self.timeout, wait_s + 5))
+        else:
+            r = self.session.get(url, headers=headers, timeout=self.timeout)
+        if cached and r.status_code == 304:
+            return cached[1]
         r.raise_for_status()
-        return r.json()
+        data = _loads(r)
+        etag = r.headers.get("ETag") if self.etags else None
+        if etag:
+            self._avatar_etags[avatar_id] = (etag, data)
+        return data
 
     def continue_training(self, avatar_id: str) -> Dict[str, Any]:
         """Follow-up training step (mapped to 'continueTranining' from your snippet)."""
-        url = f"{self.base}/api/v1/userVideoTwin/continueTranining"
-        r = self.session.post(url, json={"_id": avatar_id}, timeout=self.timeout)
+        url = self._url_continue_training
+        r = self._post_json(url, {"_id": avatar_id})
         r.raise_for_status()
-        return r.json()
+        return _loads(r)
+
+    def wait_until_avatar_ready(self, avatar_id: str, timeout_s: int = 1800, poll_s: int = 20,
+                                long_poll_s: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Polls the avatar until training reaches a terminal state.
 
-    def wait_until_avatar_ready(self, avatar_id: str, timeout_s: int = 1800, poll_s: int = 20) -> Dict[str, Any]:
+        With long_poll_s, each GET asks the server to hold the request for up to that many seconds
+        (``?wait=``). Time spent inside a held request counts towards the next poll interval, so
+        a server that honours it drives the loop by state changes; one that ignores it answers
+        immediately and the loop behaves exactly like plain polling.
+        """
         start = time.time()
-        terminal_ok = {"ready", "trained", "succeeded", "completed"}
-        terminal_bad = {"failed", "error"}
+        sleeps = _poll_sleeps(poll_s)
         while True:
-            item = self.get_avatar(avatar_id)
-            status = (item.get("data") or {}).get("current_status")
+            t0 = time.time()
+            item = self.get_avatar(avatar_id, wait_s=long_poll_s)
+            held = time.time() - t0
+            status = _avatar_status(item)
             print(f"[avatar:{avatar_id}] status = {status}")
-            if status in terminal_ok:
+            if status in _AVATAR_OK:
                 return item
-            if status in terminal_bad:
+            if status in _AVATAR_BAD:
                 raise RuntimeError(f"Avatar training failed: {json.dumps(item, ensure_ascii=False)}")
             if time.time() - start > timeout_s:
                 raise TimeoutError(f"Timed out waiting for avatar {avatar_id} to be ready")
-            time.sleep(poll_s)
+            time.sleep(max(0.0, next(sleeps) - held))
 
     # ---- Voices & TTS ----
     def list_voices(self, country: str = "en", region: str = "US", voice_map_type: str = "en-US") -> Dict[str, Any]:
-        url = f"{self.base}/api/v1/anchor/voice_list"
+        url = self._url_voice_list
         params = {"country": country, "region": region, "voice_map_type": voice_map_type}
-        r = self.session.get(url, params=params, timeout=self.timeout)
-        r.raise_for_status()
-        return r.json()
+        return self._cached_get(url, params)
 
     def generate_tts(self, msg: str, voice_id: str, *, country: str = "en", region: str = "US", speech_rate: float = 1.0) -> Dict[str, Any]:
-        url = f"{self.base}/api/v1/video/send_tts"
+        url = self._url_send_tts
         body = {"msg": msg, "tts_id": voice_id, "speechRate": speech_rate, "country": country, "region": region}
-        r = self.session.post(url, json=body, timeout=self.timeout)
+        r = self._post_json(url, body)
         r.raise_for_status()
-        return r.json()
+        return _loads(r)
 
     # ---- Anchors (characters) ----
     def list_custom_anchors(self, avatar_id: str) -> Dict[str, Any]:
-        url = f"{self.base}/api/v1/anchor/character_list"
+        url = self._url_character_list
         params = {"user_video_twin_id": avatar_id, "type": "custom"}
-        r = self.session.get(url, params=params, timeout=self.timeout)
-        r.raise_for_status()
-        return r.json()
+        return self._cached_get(url, params)
 
     # ---- Video ----
     def create_video(self, *, title: str, anchor_id: str, audio_src: str, resolution: int = 1080,
@@ -242,7 +506,7 @@ class A2EClient:
                      web_people_width: int = 270, web_people_height: int = 480,
                      web_people_x: int = 292, web_people_y: int = 0,
                      is_skip_rs: bool = True, captions: bool = False) -> Dict[str, Any]:
-        url = f"{self.base}/api/v1/video/generate"
+        url = self._url_video_generate
         body = {
             "title": title,
             "anchor_id": anchor_id,
@@ -258,17 +522,31 @@ class A2EClient:
             "isSkipRs": bool(is_skip_rs),
             "isCaptionEnabled": bool(captions),
         }
-        r = self.session.post(url, json=body, timeout=self.timeout)
+        r = self._post_json(url, body)
         r.raise_for_status()
-        return r.json()
+        return _loads(r)
 
 
     def video_result(self, task_id: str) -> Dict[str, Any]:
-        url = f"{self.base}/api/v1/video/awsResult"
-        r = self.session.post(url, json={"_id": task_id}, timeout=self.timeout)
+        url = self._url_video_result
+        r = self._post_json(url, {"_id": task_id})
         r.raise_for_status()
-        return r.json()
+        return _loads(r)
+
 
+    def _poll_video_result(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """video_result for poll loops: a transient failure (network, 429/5xx) returns None so the
+        caller simply polls again on its next tick. awsResult is read-only, so that is safe."""
+        try:
+            return self.video_result(task_id)
+        except requests.HTTPError as e:
+            if e.response is None or e.response.status_code not in _TRANSIENT_STATUSES:
+                raise
+            err: Exception = e
+        except (requests.ConnectionError, requests.Timeout) as e:
+            err = e
+        print(f"[video:{task_id}] transient error, will poll again: {err}")
+        return None
 
     def wait_until_video_ready(self, task_id: str, timeout_s: int = 1800, poll_s: int = 20) -> Dict[str, Any]:
         """
@@ -277,7 +555,8 @@ class A2EClient:
         Args:
             task_id (str): The video task ID.
             timeout_s (int): Maximum time to wait in seconds. Default 1800s (30 minutes).
-            poll_s (int): Polling interval in seconds. Default 20s.
+            poll_s (int): Maximum polling interval in seconds. Default 20s; polling starts
+                at 2s and backs off towards this value.
 
         Returns:
             Dict[str, Any]: The final result JSON from the API.
@@ -287,23 +566,22 @@ class A2EClient:
             TimeoutError: If the timeout is reached before a terminal state.
         """
         start = time.time()
-        terminal_ok = {"ready", "success", "completed"}
-        terminal_bad = {"failed", "error"}
+        sleeps = _poll_sleeps(poll_s)
 
         while True:
-            item = self.video_result(task_id)
-            # status = (item.get("data") or {}).get("current_status")
-            status = item.get("data")[0]['status']
-            print(f"[video:{task_id}] status = {status}")
-
-            if status in terminal_ok:
-                return item
-            if status in terminal_bad:
-                raise RuntimeError(f"Video task failed: {json.dumps(item, ensure_ascii=False)}")
+            item = self._poll_video_result(task_id)
+            if item is not None:
+                status = _video_status(item)
+                print(f"[video:{task_id}] status = {status}")
+
+                if status in _VIDEO_OK:
+                    return item
+                if status in _VIDEO_BAD:
+                    raise RuntimeError(f"Video task failed: {json.dumps(item, ensure_ascii=False)}")
             if time.time() - start > timeout_s:
                 raise TimeoutError(f"Timed out waiting for video task {task_id} to be ready")
 
-            time.sleep(poll_s)
+            time.sleep(next(sleeps))
 
 
 
@@ -311,14 +589,36 @@ class A2EClient:
 # File helpers
 # ----------------------------
 
-def download_file(url: str, out_path: Path, *, chunk: int = 8192) -> Path:
+def _default_session() -> requests.Session:
+    s = requests.Session()
+    s.mount("https://", _TunedAdapter(pool_connections=4, pool_maxsize=16))
+    return s
+
+
+# Per-request header overrides for downloads: image URLs usually point at a third-party CDN, so
+# drop the API session's bearer token and JSON-only headers (None removes a session header) and
+# send the same plain request the bare requests.get() used to.
+_DOWNLOAD_HEADERS = {
+    "Authorization": None,
+    "Accept": "*/*",
+    "Content-Type": None,
+    "x-lang": None,
+    "User-Agent": "python-requests",
+}
+
+# Shared pooled session for download_file() callers that don't have an A2EClient at hand.
+_SESSION = _default_session()
+
+
+def download_file(session: Optional[requests.Session], url: str, out_path: Path, *, chunk: int = 1 << 16) -> Path:
+    """Stream `url` to `out_path`, reusing `session`'s keep-alive pool (module-level pool if None)."""
+    session = session or _SESSION
     out_path.parent.mkdir(parents=True, exist_ok=True)
-    with requests.get(url, stream=True, timeout=60, headers={"User-Agent": "python-requests"}) as r:
+    with session.get(url, stream=True, timeout=60, headers=_DOWNLOAD_HEADERS) as r:
         r.raise_for_status()
+        r.raw.decode_content = True  # undo gzip/deflate transfer-encoding like iter_content() would
         with open(out_path, "wb") as f:
-            for part in r.iter_content(chunk_size=chunk):
-                if part:
-                    f.write(part)
+            shutil.copyfileobj(r.raw, f, length=chunk)
     return out_path
 
 
@@ -326,6 +626,32 @@ def download_file(url: str, out_path: Path, *, chunk: int = 8192) -> Path:
 # Orchestration
 # ----------------------------
 
+def _audio_src_from(tts: Dict[str, Any]) -> str:
+    audio_src = (tts.get("data") if isinstance(tts, dict) else None) or _first_url_from(tts, exts=(".mp3", ".aac", ".wav", ".m4a"))
+    if not audio_src:
+        raise RuntimeError("Could not extract audioSrc from TTS response; inspect printed JSON and adjust parsing.")
+    return audio_src
+
+
+def _anchor_id_from(anchors: Dict[str, Any]) -> str:
+    items = (anchors.get("data") or []) if isinstance(anchors, dict) else []
+    if not items:
+        raise RuntimeError("No custom anchors found for this avatar. Ensure your account supports custom anchors.")
+    anchor_id = items[0].get("_id")
+    if not anchor_id:
+        raise RuntimeError("First custom anchor has no _id field.")
+    return anchor_id
+
+
+def _video_task_id_from(vid: Dict[str, Any]) -> str:
+    if vid.get("code") != 0:
+        raise RuntimeError(f"Video generation failed (code={vid.get('code')}): {vid.get('msg') or vid.get('message')}")
+    task_id = (vid.get("data") or {}).get("_id")
+    if not task_id:
+        raise RuntimeError("No task _id returned from video generation.")
+    return task_id
+
+
 def run_pipeline(
     *,
     name: str,
@@ -337,111 +663,225 @@ def run_pipeline(
     height: int = 768,
     auto_approve: bool = False,
     lip_sync: bool = False,
+    long_poll_s: Optional[int] = None,
 ) -> None:
     load_dotenv()
 
     token = _env("A2E_API_TOKEN")
     base = os.getenv("A2E_BASE", "https://video.a2e.ai")
 
-    client = A2EClient(token=token, base=base)
-
-    # 1) TEXT → IMAGE
-    print("\n[1/6] Generating image from prompt…")
-    t2i = client.text2image(name=name, prompt=prompt, width=width, height=height)
-    _print_json("text2image response", t2i)
-
-    image_urls = ((t2i.get("data") or {}).get("image_urls")) or []
-    if not image_urls:
-        raise RuntimeError("No image_urls returned from text2image.")
-    image_url = image_urls[0]
-    print(f"Selected image URL: {image_url}")
-
-    # Save locally
-    ext = Path(image_url).suffix or ".jpg"
-    out_path = Path(f"avatar{ext}")
-    print(f"Downloading to: {out_path} …")
-    download_file(image_url, out_path)
-    print(f"Saved -> {out_path.resolve()}")
-
-    # 2) APPROVAL
-    if not auto_approve:
-        ans = input("Proceed to train avatar with this image? [y/N] ").strip().lower()
-        if ans not in {"y", "yes"}:
-            print("Aborted by user before training.")
-            return
-
-    # 3) TRAIN AVATAR
-    print("\n[2/6] Starting avatar training from image URL…")
-    av_start = client.start_avatar_training_from_image(name=name, gender=gender, image_url=image_url)
-    _print_json("startTraining response", av_start)
-
-    if av_start.get("code") != 0:
-        raise RuntimeError("Avatar startTraining failed.")
-
-    avatar_id = (av_start.get("data") or {}).get("_id")
-    if not avatar_id:
-        raise RuntimeError("No avatar_id returned from startTraining.")
-    print(f"avatar_id = {avatar_id}")
-
-    print("\n[3/6] Waiting for avatar to be ready… (this can take a while)")
-    ready_info = client.wait_until_avatar_ready(avatar_id)
-    _print_json("avatar ready info", ready_info)
-
-    # 4) OPTIONAL: LIP SYNC / CONTINUE TRAINING
-    if lip_sync:
-        print("\n[4/6] Triggering follow-up lip-sync training (continueTranining)…")
-        cont = client.continue_training(avatar_id)
-        _print_json("continueTranining response", cont)
-        # Optionally wait again if the API indicates asynchronous work
-        try:
-            print("Re-checking avatar readiness after continueTranining…")
-            ready_info = client.wait_until_avatar_ready(avatar_id)
-            _print_json("avatar ready info (post-continue)", ready_info)
-        except Exception as e:
-            print(f"Warning: post-continue wait error: {e}")
-
-    # 5) TTS
-    print("\n[5/6] Generating TTS audio…")
-    tts = client.generate_tts(script, voice_id)
-    _print_json("send_tts response", tts)
-    audio_src = (tts.get("data") if isinstance(tts, dict) else None) or _first_url_from(tts, exts=(".mp3", ".aac", ".wav", ".m4a"))
-    if not audio_src:
-        raise RuntimeError("Could not extract audioSrc from TTS response; inspect printed JSON and adjust parsing.")
-    print(f"audioSrc = {audio_src}")
+    with A2EClient(token=token, base=base, etags=os.getenv("A2E_ETAGS") == "1") as client:
+        # 1) TEXT → IMAGE
+        print("\n[1/6] Generating image from prompt…")
+        t2i = client.text2image(name=name, prompt=prompt, width=width, height=height)
+        _log_json("text2image response", t2i)
+
+        image_urls = ((t2i.get("data") or {}).get("image_urls")) or []
+        if not image_urls:
+            raise RuntimeError("No image_urls returned from text2image.")
+        image_url = image_urls[0]
+        print(f"Selected image URL: {image_url}")
+
+        # Save locally — in the background, so an auto-approved run can submit training meanwhile
+        ext = Path(image_url).suffix or ".jpg"
+        out_path = Path(f"avatar{ext}")
+        print(f"Downloading to: {out_path} …")
+        download_fut = client.submit(download_file, client.session, image_url, out_path)
+
+        def finish_download() -> None:
+            print(f"Saved -> {download_fut.result().resolve()}")
+
+        # 2) APPROVAL
+        if not auto_approve:
+            finish_download()  # the user needs the local file to judge the image
+            ans = input("Proceed to train avatar with this image? [y/N] ").strip().lower()
+            if ans not in {"y", "yes"}:
+                print("Aborted by user before training.")
+                return
+
+        # 3) TRAIN AVATAR
+        print("\n[2/6] Starting avatar training from image URL…")
+        av_start = client.start_avatar_training_from_image(name=name, gender=gender, image_url=image_url)
+        _log_json("startTraining response", av_start)
+
+        if av_start.get("code") != 0:
+            raise RuntimeError("Avatar startTraining failed.")
+
+        avatar_id = (av_start.get("data") or {}).get("_id")
+        if not avatar_id:
+            raise RuntimeError("No avatar_id returned from startTraining.")
+        print(f"avatar_id = {avatar_id}")
+        if auto_approve:
+            # Training is already paid for by now; the local preview copy is optional, so don't abort over it
+            try:
+                finish_download()
+            except Exception as e:
+                print(f"Warning: could not save the local image copy: {e}")
+
+        # TTS only needs the script and voice, so synthesize it while the avatar trains
+        print("Generating TTS audio in the background…")
+        tts_fut = client.submit(client.generate_tts, script, voice_id)
+
+        # Cached/duplicate avatars can come back from startTraining already trained: skip the poll loop then
+        if _avatar_status(av_start) in _AVATAR_OK:
+            print("\n[3/6] Avatar is already ready.")
+            ready_info = av_start
+        else:
+            print("\n[3/6] Waiting for avatar to be ready… (this can take a while)")
+            ready_info = client.wait_until_avatar_ready(avatar_id, long_poll_s=long_poll_s)
+        _log_json("avatar ready info", ready_info)
+
+        # 4) OPTIONAL: LIP SYNC / CONTINUE TRAINING
+        if lip_sync:
+            print("\n[4/6] Triggering follow-up lip-sync training (continueTranining)…")
+            cont = client.continue_training(avatar_id)
+            _log_json("continueTranining response", cont)
+            # Optionally wait again if the API indicates asynchronous work
+            try:
+                print("Re-checking avatar readiness after continueTranining…")
+                ready_info = client.wait_until_avatar_ready(avatar_id, long_poll_s=long_poll_s)
+                _log_json("avatar ready info (post-continue)", ready_info)
+            except Exception as e:
+                print(f"Warning: post-continue wait error: {e}")
+
+        # 5) TTS (already running) + ANCHORS
+        print("\n[5/6] Collecting TTS audio and fetching custom anchors for this avatar…")
+        anchors = client.list_custom_anchors(avatar_id)
+        tts = tts_fut.result()
+
+        _log_json("send_tts response", tts)
+        audio_src = _audio_src_from(tts)
+        print(f"audioSrc = {audio_src}")
+
+        # 6) ANCHOR + VIDEO
+        print("\n[6/6] Creating video from the custom anchor…")
+        _log_json("character_list (custom) response", anchors)
+        anchor_id = _anchor_id_from(anchors)
+        print(f"anchor_id = {anchor_id}")
+
+        vid = client.create_video(title=f"{name} Greeting Video", anchor_id=anchor_id, audio_src=audio_src)
+        _log_json("video generate response", vid)
+        task_id = _video_task_id_from(vid)
+        print(f"video task_id = {task_id}")
+
+        # Fetch result once (you can loop/poll if needed)
+        result = client.video_result(task_id)
+        _log_json("video awsResult response", result)
+
+        video_url = _first_url_from(result, exts=(".mp4", ".m3u8", ".mov", ".webm"))
+        if video_url:
+            print(f"\n✅ Best-guess video URL: {video_url}")
+        else:
+            print("\nℹ️ Could not auto-detect a direct video URL. Inspect the printed JSON above for downloadable links.")
 
-    # 6) ANCHOR + VIDEO
-    print("\n[6/6] Fetching custom anchors for this avatar…")
-    anchors = client.list_custom_anchors(avatar_id)
-    _print_json("character_list (custom) response", anchors)
-
-    items = (anchors.get("data") or []) if isinstance(anchors, dict) else []
-    if not items:
-        raise RuntimeError("No custom anchors found for this avatar. Ensure your account supports custom anchors.")
-    anchor_id = items[0].get("_id")
-    if not anchor_id:
-        raise RuntimeError("First custom anchor has no _id field.")
-    print(f"anchor_id = {anchor_id}")
 
-    vid = client.create_video(title=f"{name} Greeting Video", anchor_id=anchor_id, audio_src=audio_src)
-    _print_json("video generate response", vid)
+@dataclass
+class Job:
+    """One video to render with an already-trained avatar (see run_pipeline_batch)."""
+    name: str
+    script: str
+    voice_id: str
+    avatar_id: str
+
+
+def run_pipeline_batch(jobs: list[Job], *, timeout_s: int = 1800, poll_s: int = 20) -> Dict[str, Dict[str, Any]]:
+    """
+    Render several videos at once: submit every TTS + video job up-front, then poll them all
+    from a single loop, so N jobs share one connection pool and one polling schedule.
+
+    Args:
+        jobs (list[Job]): Jobs to run; names must be unique.
+        timeout_s (int): Maximum time to wait for all videos in seconds. Default 1800s.
+        poll_s (int): Maximum polling interval in seconds. Default 20s.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Per job name, the final awsResult JSON (succeeded and failed
+            renders), or ``{"error": "..."}`` for a job that could not be submitted, whose
+            polling failed, or that was still rendering after timeout_s (the latter two also
+            carry its ``task_id``). One job's failure never stops the others.
+
+    Raises:
+        ValueError: If two jobs share a name.
+    """
+    names = [job.name for job in jobs]
+    duplicates = sorted({n for n in names if names.count(n) > 1})
+    if duplicates:
+        raise ValueError(f"Job names must be unique; duplicated: {', '.join(duplicates)}")
 
-    if vid.get("code") != 0:
-        raise RuntimeError("Video generation failed; see response above.")
+    load_dotenv()
 
-    task_id = (vid.get("data") or {}).get("_id")
-    if not task_id:
-        raise RuntimeError("No task _id returned from video generation.")
-    print(f"video task_id = {task_id}")
+    token = _env("A2E_API_TOKEN")
+    base = os.getenv("A2E_BASE", "https://video.a2e.ai")
 
-    # Fetch result once (you can loop/poll if needed)
-    result = client.video_result(task_id)
-    _print_json("video awsResult response", result)
+    with A2EClient(token=token, base=base, max_workers=8) as client:
+        # Phase 1: TTS and anchor lookups for every job, all in flight together
+        print(f"\n[batch] Generating TTS and fetching anchors for {len(jobs)} job(s)…")
+        tts_futs = [client.submit(client.generate_tts, job.script, job.voice_id) for job in jobs]
+        anchor_futs = [client.submit(client.list_custom_anchors, job.avatar_id) for job in jobs]
+
+        results: Dict[str, Dict[str, Any]] = {}
+
+        def job_failed(name: str, stage: str, e: Exception) -> None:
+            print(f"[batch:{name}] {stage} failed: {e}")
+            results[name] = {"error": f"{stage} failed: {e}"}
+
+        # Phase 2: submit a video for every job whose TTS and anchor are available
+        print("[batch] Submitting video jobs…")
+        video_futs: Dict[str, concurrent.futures.Future] = {}
+        for job, tts_fut, anchors_fut in zip(jobs, tts_futs, anchor_futs):
+            try:
+                audio_src = _audio_src_from(tts_fut.result())
+                anchor_id = _anchor_id_from(anchors_fut.result())
+            except Exception as e:
+                job_failed(job.name, "TTS/anchor lookup", e)
+                continue
+            video_futs[job.name] = client.submit(client.create_video, title=f"{job.name} Video",
+                                                 anchor_id=anchor_id, audio_src=audio_src)
+        pending: Dict[str, str] = {}  # task_id -> job name
+        for name, fut in video_futs.items():
+            try:
+                task_id = _video_task_id_from(fut.result())
+            except Exception as e:
+                job_failed(name, "video generation", e)
+                continue
+            print(f"[batch:{name}] video task_id = {task_id}")
+            pending[task_id] = name
+
+        # Phase 3: one polling loop for all outstanding tasks
+        start = time.time()
+        sleeps = _poll_sleeps(poll_s)
+        while pending:
+            task_ids = list(pending)
+            polls = [client.submit(client._poll_video_result, task_id) for task_id in task_ids]
+            for task_id, fut in zip(task_ids, polls):
+                try:
+                    item = fut.result()
+                except Exception as e:  # e.g. a 4xx or a non-JSON body for this task only
+                    name = pending.pop(task_id)
+                    job_failed(name, "video polling", e)
+                    results[name]["task_id"] = task_id
+                    continue
+                if item is None:
+                    continue
+                status = _video_status(item)
+                print(f"[video:{task_id}] status = {status}")
+                if status in _VIDEO_OK or status in _VIDEO_BAD:
+                    name = pending.pop(task_id)
+                    results[name] = item
+                    if status in _VIDEO_BAD:
+                        print(f"[batch:{name}] video task failed")
+                    else:
+                        print(f"[batch:{name}] ✅ Best-guess video URL: {_first_url_from(item, exts=('.mp4', '.m3u8', '.mov', '.webm'))}")
+            if not pending:
+                break
+            if time.time() - start > timeout_s:
+                for task_id, name in pending.items():
+                    print(f"[batch:{name}] timed out waiting for video task {task_id}")
+                    results[name] = {"error": f"timed out after {timeout_s}s", "task_id": task_id}
+                break
+            time.sleep(next(sleeps))
 
-    video_url = _first_url_from(result, exts=(".mp4", ".m3u8", ".mov", ".webm"))
-    if video_url:
-        print(f"\n✅ Best-guess video URL: {video_url}")
-    else:
-        print("\nℹ️ Could not auto-detect a direct video URL. Inspect the printed JSON above for downloadable links.")
+    return results
 
 
 # ----------------------------
@@ -459,11 +899,14 @@ def parse_args(argv: list[str]) -> argparse.Namespace:
     p.add_argument("--height", type=int, default=768)
     p.add_argument("--auto-approve", action="store_true", help="Skip the approval prompt and continue automatically")
     p.add_argument("--lip-sync", action="store_true", help="Trigger extra training step mapped to continueTranining")
+    p.add_argument("--long-poll", type=int, metavar="SECONDS", default=None,
+                   help="Ask the API to hold avatar status requests up to SECONDS (long-poll), if supported")
     return p.parse_args(argv)
 
 
 def main(argv: list[str]) -> None:
     args = parse_args(argv)
+    logging.basicConfig(level=os.getenv("A2E_LOG", "INFO").upper(), format="%(message)s", stream=sys.stdout)
     run_pipeline(
         name=args.name,
         gender=args.gender,
@@ -474,6 +917,7 @@ def main(argv: list[str]) -> None:
         height=args.height,
         auto_approve=args.auto_approve,
         lip_sync=args.lip_sync,
+        long_poll_s=args.long_poll,
     )
 
 
@@ -481,8 +925,10 @@ if __name__ == "__main__":
     try:
         main(sys.argv[1:])
     except KeyboardInterrupt:
-        print("\nInterrupted.")
-        sys.exit(130)
+        print("\nInterrupted.", flush=True)
+        # os._exit: a normal exit would still join the client's worker threads at interpreter
+        # shutdown, i.e. wait out an in-flight download/TTS request after Ctrl-C.
+        os._exit(130)
     except Exception as e:
         print(f"\nERROR: {e}")
         sys.exit(1)